@@ -4,7 +4,7 @@ Flight Search Agent Package
 A LangChain-based AI agent for flight search using AWS Bedrock.
 Accessible via A2A Protocol for agent-to-agent communication.
 """
-from agent.config import settings
+from agent.config import get_settings
 from agent.agent_core import FlightSearchAgent, get_agent
 from agent.a2a_server import (
     FlightSearchAgentExecutor,
@@ -15,7 +15,7 @@ from agent.a2a_server import (
 __version__ = "1.0.0"
 
 __all__ = [
-    "settings",
+    "get_settings",
     "FlightSearchAgent",
     "get_agent",
     "FlightSearchAgentExecutor",
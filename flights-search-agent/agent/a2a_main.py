@@ -4,17 +4,24 @@ A2A Protocol server application using the official A2A Python SDK.
 This wraps the LangChain agent with the A2A protocol for agent-to-agent communication.
 Uses JSON-RPC protocol with a single /agent endpoint.
 """
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import Optional
 
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
 
 from a2a.server.apps.jsonrpc import A2AFastAPIApplication
 from a2a.types import AgentCard
 
-from agent.config import settings
+from agent.config import get_settings
 from agent.a2a_server import get_request_handler, get_agent_executor_instance, set_request_bearer_token
 
+settings = get_settings()
+
 # Configure logging
 logging.basicConfig(
     level=getattr(logging, settings.log_level.upper()),
@@ -75,6 +82,19 @@ app = a2a_jsonrpc_app.build(
     rpc_url="/agent"  # Single endpoint for all operations
 )
 
+# Serve the AgentCard from its pre-serialized bytes instead of re-dumping the
+# model on every request; inserted first so it takes precedence over the SDK route
+agent_card_json = agent_executor.get_agentcard_json()
+
+
+async def agent_card_endpoint(request: Request) -> Response:
+    return Response(content=agent_card_json, media_type="application/json")
+
+
+app.router.routes.insert(
+    0, Route("/.well-known/agent-card.json", agent_card_endpoint, methods=["GET"])
+)
+
 
 class AuthorizationCaptureMiddleware(BaseHTTPMiddleware):
     """Capture Authorization header and set bearer token in context for the request."""
@@ -90,6 +110,38 @@ class AuthorizationCaptureMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(AuthorizationCaptureMiddleware)
 
+# Max time startup waits for the warm-up; a slower warm-up keeps running in the background
+WARMUP_TIMEOUT_SECONDS = 5.0
+
+# Strong reference so a warm-up that outlives startup is not garbage-collected
+_warmup_task: Optional["asyncio.Task[None]"] = None
+
+
+async def warmup_agent() -> None:
+    """Warm up the agent, waiting at most WARMUP_TIMEOUT_SECONDS."""
+    global _warmup_task
+    logger.info("Warming up agent...")
+    _warmup_task = asyncio.ensure_future(agent_executor.langchain_agent.warmup())
+    try:
+        await asyncio.wait_for(asyncio.shield(_warmup_task), timeout=WARMUP_TIMEOUT_SECONDS)
+        logger.info("Agent warm-up complete")
+    except asyncio.TimeoutError:
+        logger.warning("Agent warm-up still running after %.0fs, continuing startup", WARMUP_TIMEOUT_SECONDS)
+
+
+if settings.warmup_on_start:
+    # Startup event handlers are deprecated (and gone from recent Starlette), so
+    # wrap the SDK app's lifespan instead
+    _sdk_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def _lifespan_with_warmup(app):
+        async with _sdk_lifespan(app) as state:
+            await warmup_agent()
+            yield state
+
+    app.router.lifespan_context = _lifespan_with_warmup
+
 logger.info("A2A JSON-RPC FastAPI application built successfully")
 logger.info("A2A JSON-RPC endpoint:")
 logger.info(f"  - POST /agent (All operations via JSON-RPC)")
@@ -4,11 +4,15 @@ A2A Protocol server implementation wrapping the LangChain agent.
 import base64
 import json
 import logging
+import re
+import threading
 import uuid
 import contextvars
+from functools import lru_cache
 from typing import Optional, List, AsyncIterator, Any
 from datetime import datetime
 
+from langchain_core.messages import BaseMessage
 from a2a.types import (
     AgentCard,
     AgentSkill,
@@ -27,13 +31,24 @@ from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore
-from a2a.utils import new_agent_text_message, new_task, new_text_artifact
+from a2a.utils import new_agent_text_message, new_data_artifact, new_task, new_text_artifact
 
-from agent.agent_core import get_agent
-from agent.config import settings
+from agent.agent_core import STREAM_RESET, get_agent
+from agent.history_store import create_history_store
+from agent.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Phrases indicating the agent needs more input, compiled once into a single
+# case-insensitive alternation so responses are scanned in one pass.
+# "could you please provide" is covered by "please provide", and the "wh..."
+# phrases share a prefix so the engine tests it once per position.
+_ASKING_RE = re.compile(
+    r"please provide|could you specify|can you tell me|i need to know|"
+    r"need more information|more details|wh(?:ich city|ere are you|at is your)",
+    re.IGNORECASE,
+)
+
 # Context var for request-scoped bearer token (set by middleware from Authorization header)
 _request_bearer_token_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
     "request_bearer_token", default=None
@@ -86,17 +101,96 @@ def get_auth_metadata() -> dict[str, Any]:
     return {"exchange_token": raw, "exchange_token_decoded": decoded}
 
 
+# AgentSkill has no schema fields (unknown keys are dropped by the model), so
+# each skill's request shape is carried by its description, examples and modes
+_BATCH_SEARCH_FLIGHTS_EXAMPLE = json.dumps({
+    "items": [
+        {"origin": "New York", "destination": "London", "budget": 500},
+        {"origin": "LAX", "destination": "NYC"}
+    ]
+})
+
+
+@lru_cache(maxsize=1)
+def _build_agent_card() -> AgentCard:
+    """
+    Build the AgentCard describing agent capabilities.
+
+    The card is static, so it is built once, on first use rather than at
+    import: it reads settings, which must not load as an import side effect.
+    """
+    settings = get_settings()
+    return AgentCard(
+        name="Flight Search Agent",
+        description="AI-powered flight search agent using LangChain and AWS Bedrock",
+        url="https://a2a-flight-search-agent-21a3ba068989.herokuapp.com/agent",
+        version="1.0.0",
+        defaultInputModes=["STREAM"],  # Required field
+        defaultOutputModes=["STREAM"],  # Required field
+        skills=[
+            AgentSkill(
+                id="search_flights",
+                name="search_flights",
+                description=(
+                    "Search for flights based on origin, destination, and budget. "
+                    "Origin and destination may be cities or airport codes "
+                    "(e.g., 'New York', 'JFK'); the budget is an optional maximum in USD."
+                ),
+                tags=["flight", "search", "travel", "booking"],
+                examples=[
+                    "Find me flights from New York to London under $500",
+                    "Flights from LAX to NYC"
+                ],
+                inputModes=["text/plain"],
+                outputModes=["text/plain"]
+            ),
+            AgentSkill(
+                id="batch_search_flights",
+                name="batch_search_flights",
+                description=(
+                    "Run several independent flight searches concurrently. Send a data "
+                    "part {\"items\": [...]} where each item has 'origin', 'destination' "
+                    "and an optional 'budget' in USD. Returns a data artifact "
+                    "{\"results\": [...]} with one result per item, in request order."
+                ),
+                tags=["flight", "search", "travel", "batch"],
+                examples=[_BATCH_SEARCH_FLIGHTS_EXAMPLE],
+                inputModes=["application/json"],
+                outputModes=["application/json"]
+            )
+        ],
+        capabilities={
+            "streaming": True,
+            "context_grouping": True,
+            "natural_language": True
+        },
+        authentication={
+            "type": "none"  # No auth for demo purposes
+        },
+        metadata={
+            "llm_provider": "aws_bedrock",
+            "llm_model": settings.bedrock_model_id,
+            "framework": "langchain",
+            "mcp_enabled": settings.mcp_enabled
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def _agent_card_json() -> bytes:
+    """Serialize the AgentCard once for the pre-serialized card route."""
+    return _build_agent_card().model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
 class FlightSearchAgentExecutor(AgentExecutor):
     """
     AgentExecutor implementation that wraps the LangChain agent.
     """
 
-    # In-memory storage for chat histories keyed by context_id
-    _chat_histories: dict[str, list[dict]] = {}
-
     def __init__(self):
         """Initialize the agent executor."""
         self.langchain_agent = get_agent()
+        self.history_store = create_history_store()
         logger.info("AgentExecutor initialized with LangChain agent")
     
     async def execute(
@@ -128,114 +222,86 @@ class FlightSearchAgentExecutor(AgentExecutor):
                 task.metadata = {**existing, **auth_metadata}
                 await event_queue.enqueue_event(task)
             
+            # Structured batch requests bypass the conversational flow
+            batch_items = self._extract_batch_items(message.parts)
+            if batch_items is not None:
+                await self._execute_batch(task, batch_items, event_queue, auth_metadata)
+                return
+            
             # Extract text from message parts
             user_message = self._extract_text_from_parts(message.parts)
-            logger.info(f"Executing agent for task {task.id}: {user_message[:100]}...")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Executing agent for task %s: %s...", task.id, user_message[:100])
 
             # Get context history using task.context_id
             context_id = task.context_id
             chat_history = await self._get_chat_history(context_id)
 
             # Store the user message in history
-            self._store_chat_message(context_id, "user", user_message)
+            await self._store_chat_message(context_id, "user", user_message)
 
-            # Process with LangChain agent
-            result = await self.langchain_agent.chat(
-                message=user_message,
-                chat_history=chat_history
+            # Stream the LangChain agent's answer as chunks of one artifact. After
+            # a reset (text that preceded a tool call) the next chunk is sent with
+            # append=False so it replaces the artifact's parts
+            artifact_id = str(uuid.uuid4())
+            response_parts: List[str] = []
+            try:
+                async for chunk in self.langchain_agent.chat_stream(
+                    message=user_message,
+                    chat_history=chat_history
+                ):
+                    if chunk is STREAM_RESET:
+                        response_parts.clear()
+                        continue
+                    await self._enqueue_artifact_chunk(
+                        task, artifact_id, chunk,
+                        append=bool(response_parts),
+                        last_chunk=False,
+                        event_queue=event_queue,
+                        auth_metadata=auth_metadata,
+                    )
+                    response_parts.append(chunk)
+            except Exception as e:
+                logger.error("Agent returned error: %s", e, exc_info=True)
+                await self._enqueue_failed(task, str(e), event_queue, auth_metadata)
+                return
+
+            response_text = "".join(response_parts)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Agent response ready: %s...", response_text[:100])
+
+            # Store the assistant response in history
+            await self._store_chat_message(context_id, "assistant", response_text)
+
+            # Close the artifact with the full text as a single part, replacing the
+            # per-token parts so blocking message/send clients get one text part
+            await self._enqueue_artifact_chunk(
+                task, artifact_id, response_text,
+                append=False,
+                last_chunk=True,
+                event_queue=event_queue,
+                auth_metadata=auth_metadata,
             )
+
+            # Detect if the agent is asking for more information
+            is_asking_questions = self._is_asking_for_input(response_text)
             
-            # Handle response
-            if result.get("success"):
-                raw_message = result["message"]
-    
-    # --- ADD THIS EXTRACTION LOGIC ---
-                if isinstance(raw_message, list):
-                   # Extract the 'text' value from the first item in the list if it's a dict
-                   if len(raw_message) > 0 and isinstance(raw_message[0], dict):
-                    response_text = raw_message[0].get("text", str(raw_message))
-                   else:
-                    response_text = str(raw_message)
-                else:
-                    response_text = raw_message
-    # ---------------------------------
-                logger.info(f"Agent response ready: {response_text[:100]}...")
-
-                # Store the assistant response in history
-                self._store_chat_message(context_id, "assistant", response_text)
-
-                # Detect if the agent is asking for more information
-                is_asking_questions = self._is_asking_for_input(response_text)
-                
-                if is_asking_questions:
-                    # Agent needs more input - return input_required state
-                    logger.info("Agent is requesting more information - returning input_required state")
-                    input_required_msg = new_agent_text_message(
-                        response_text,
-                        task.context_id,
-                        task.id,
-                    )
-                    existing_msg_meta = getattr(input_required_msg, "metadata", None) or {}
-                    input_required_msg.metadata = {**existing_msg_meta, **auth_metadata}
-                    await event_queue.enqueue_event(
-                        TaskStatusUpdateEvent(
-                            status=TaskStatus(
-                                state=TaskState.input_required,
-                                message=input_required_msg,
-                            ),
-                            final=True,
-                            context_id=task.context_id,
-                            task_id=task.id,
-                            metadata=auth_metadata,
-                        )
-                    )
-                else:
-                    # Agent has complete answer - return completed state
-                    logger.info("Agent has complete answer - returning completed state")
-                    result_artifact = new_text_artifact(
-                        name='flight_search_result',
-                        description='Flight search results',
-                        text=response_text,
-                    )
-                    existing_artifact_meta = getattr(result_artifact, "metadata", None) or {}
-                    result_artifact.metadata = {**existing_artifact_meta, **auth_metadata}
-                    # First send the result as an artifact
-                    await event_queue.enqueue_event(
-                        TaskArtifactUpdateEvent(
-                            append=False,
-                            context_id=task.context_id,
-                            task_id=task.id,
-                            last_chunk=True,
-                            artifact=result_artifact,
-                            metadata=auth_metadata,
-                        )
-                    )
-                    # Then send completed status
-                    await event_queue.enqueue_event(
-                        TaskStatusUpdateEvent(
-                            status=TaskStatus(state=TaskState.completed),
-                            final=True,
-                            context_id=task.context_id,
-                            task_id=task.id,
-                            metadata=auth_metadata,
-                        )
-                    )
-            else:
-                # Handle error
-                error_text = result.get("error", "Unknown error occurred")
-                logger.error(f"Agent returned error: {error_text}")
-                error_msg = new_agent_text_message(
-                    f"Error: {error_text}",
+            if is_asking_questions:
+                # Agent needs more input - return input_required state. The question
+                # was streamed as the artifact and is repeated as the status message
+                logger.info("Agent is requesting more information - returning input_required state")
+                input_required_msg = new_agent_text_message(
+                    response_text,
                     task.context_id,
                     task.id,
                 )
-                existing_error_meta = getattr(error_msg, "metadata", None) or {}
-                error_msg.metadata = {**existing_error_meta, **auth_metadata}
+                existing_msg_meta = getattr(input_required_msg, "metadata", None) or {}
+                input_required_msg.metadata = {**existing_msg_meta, **auth_metadata}
                 await event_queue.enqueue_event(
                     TaskStatusUpdateEvent(
                         status=TaskStatus(
-                            state=TaskState.failed,
-                            message=error_msg,
+                            state=TaskState.input_required,
+                            message=input_required_msg,
                         ),
                         final=True,
                         context_id=task.context_id,
@@ -243,9 +309,21 @@ class FlightSearchAgentExecutor(AgentExecutor):
                         metadata=auth_metadata,
                     )
                 )
+            else:
+                # Agent has complete answer - return completed state
+                logger.info("Agent has complete answer - returning completed state")
+                await event_queue.enqueue_event(
+                    TaskStatusUpdateEvent(
+                        status=TaskStatus(state=TaskState.completed),
+                        final=True,
+                        context_id=task.context_id,
+                        task_id=task.id,
+                        metadata=auth_metadata,
+                    )
+                )
         
         except Exception as e:
-            logger.error(f"Exception in agent execution: {e}", exc_info=True)
+            logger.error("Exception in agent execution: %s", e, exc_info=True)
             auth_metadata = get_auth_metadata()
             # Try to send error status if we have task info
             try:
@@ -271,7 +349,65 @@ class FlightSearchAgentExecutor(AgentExecutor):
                         )
                     )
             except Exception as queue_error:
-                logger.error(f"Failed to enqueue error status: {queue_error}")
+                logger.error("Failed to enqueue error status: %s", queue_error)
+    
+    async def _enqueue_artifact_chunk(
+        self,
+        task: Task,
+        artifact_id: str,
+        text: str,
+        append: bool,
+        last_chunk: bool,
+        event_queue: EventQueue,
+        auth_metadata: dict[str, Any]
+    ) -> None:
+        """Send one chunk of the flight search result artifact."""
+        result_artifact = new_text_artifact(
+            name='flight_search_result',
+            description='Flight search results',
+            text=text,
+        )
+        result_artifact.artifact_id = artifact_id
+        existing_artifact_meta = getattr(result_artifact, "metadata", None) or {}
+        result_artifact.metadata = {**existing_artifact_meta, **auth_metadata}
+        await event_queue.enqueue_event(
+            TaskArtifactUpdateEvent(
+                append=append,
+                context_id=task.context_id,
+                task_id=task.id,
+                last_chunk=last_chunk,
+                artifact=result_artifact,
+                metadata=auth_metadata,
+            )
+        )
+
+    async def _enqueue_failed(
+        self,
+        task: Task,
+        error_text: str,
+        event_queue: EventQueue,
+        auth_metadata: dict[str, Any]
+    ) -> None:
+        """Send a final failed status carrying the error message."""
+        error_msg = new_agent_text_message(
+            f"Error: {error_text}",
+            task.context_id,
+            task.id,
+        )
+        existing_error_meta = getattr(error_msg, "metadata", None) or {}
+        error_msg.metadata = {**existing_error_meta, **auth_metadata}
+        await event_queue.enqueue_event(
+            TaskStatusUpdateEvent(
+                status=TaskStatus(
+                    state=TaskState.failed,
+                    message=error_msg,
+                ),
+                final=True,
+                context_id=task.context_id,
+                task_id=task.id,
+                metadata=auth_metadata,
+            )
+        )
     
     async def cancel(
         self, 
@@ -285,7 +421,7 @@ class FlightSearchAgentExecutor(AgentExecutor):
         """
         task = context.current_task
         if task:
-            logger.warning(f"Task cancellation requested for {task.id} - not implemented")
+            logger.warning("Task cancellation requested for %s - not implemented", task.id)
         else:
             logger.warning("Task cancellation requested but no task found")
         
@@ -295,117 +431,33 @@ class FlightSearchAgentExecutor(AgentExecutor):
     
     def get_agentcard(self) -> AgentCard:
         """Return the AgentCard describing agent capabilities (synchronous)."""
-        return AgentCard(
-            name="Flight Search Agent",
-            description="AI-powered flight search agent using LangChain and AWS Bedrock",
-            url="https://a2a-flight-search-agent-21a3ba068989.herokuapp.com/agent",
-            version="1.0.0",
-            defaultInputModes=["STREAM"],  # Required field
-            defaultOutputModes=["STREAM"],  # Required field
-            skills=[
-                AgentSkill(
-                    id="search_flights",
-                    name="search_flights",
-                    description="Search for flights based on origin, destination, and budget",
-                    tags=["flight", "search", "travel", "booking"],
-                    input_schema={
-                        "type": "object",
-                        "properties": {
-                            "origin": {
-                                "type": "string",
-                                "description": "Origin city or airport code (e.g., 'NYC', 'New York', 'JFK')"
-                            },
-                            "destination": {
-                                "type": "string",
-                                "description": "Destination city or airport code (e.g., 'London', 'LAX')"
-                            },
-                            "budget": {
-                                "type": "number",
-                                "description": "Maximum budget in USD (optional)"
-                            }
-                        },
-                        "required": ["origin", "destination"]
-                    },
-                    output_schema={
-                        "type": "object",
-                        "properties": {
-                            "flights": {
-                                "type": "array",
-                                "description": "List of available flights"
-                            },
-                            "flights_found": {
-                                "type": "integer",
-                                "description": "Number of flights found"
-                            }
-                        }
-                    }
-                )
-            ],
-            capabilities={
-                "streaming": False,
-                "context_grouping": True,
-                "natural_language": True
-            },
-            authentication={
-                "type": "none"  # No auth for demo purposes
-            },
-            metadata={
-                "llm_provider": "aws_bedrock",
-                "llm_model": settings.bedrock_model_id,
-                "framework": "langchain",
-                "mcp_enabled": settings.mcp_enabled
-            }
-        )
+        return _build_agent_card()
+
+    def get_agentcard_json(self) -> bytes:
+        """Return the pre-serialized AgentCard JSON."""
+        return _agent_card_json()
     
     def _is_asking_for_input(self, response_text: str) -> bool:
         """
         Detect if the agent's response is asking for more information.
         
-        Returns True if the response contains questions or requests for clarification.
+        Returns True if the response contains a question mark and one of the
+        clarification phrases in _ASKING_RE. A question alone is not enough:
+        "Here are 3 flights... Would you like me to book one?" is a complete
+        answer and returns False.
         """
-        # Indicators that the agent needs more input
-        asking_indicators = [
-            "could you please provide",
-            "please provide",
-            "i need to know",
-            "can you tell me",
-            "could you specify",
-            "which city",
-            "where are you",
-            "what is your",
-            "more details",
-            "need more information",
-            "?",  # Contains question marks
-        ]
-        
         if isinstance(response_text, list):
             # Extract content from LangChain message objects if necessary
-            response_text = " ".join([
-              m.content if hasattr(m, 'content') else str(m) 
-              for m in response_text
-            ])
-        else:
-            response_text = response_text
+            response_text = " ".join(getattr(m, "content", None) or str(m) for m in response_text)
         
-        response_lower = response_text.lower()
+        # Asking for input requires a question, so most answers skip the scan
+        if "?" not in response_text:
+            return False
         
-        # Check if response contains question indicators
-        has_question_mark = "?" in response_text
-        has_asking_phrase = any(indicator in response_lower for indicator in asking_indicators)
-        
-        # Check if response is asking for origin, destination, or budget
-        is_asking_flight_details = any(keyword in response_lower for keyword in [
-            "departure city",
-            "arrival city",
-            "origin",
-            "destination",
-            "budget"
-        ]) and has_question_mark
-        
-        result = has_asking_phrase and has_question_mark
+        result = _ASKING_RE.search(response_text) is not None
         
         if result:
-            logger.info(f"Detected input request in response (has questions)")
+            logger.info("Detected input request in response (has questions)")
         
         return result
     
@@ -414,58 +466,125 @@ class FlightSearchAgentExecutor(AgentExecutor):
         text_parts = []
         
         for part in parts:
-            # Part is a Pydantic model, access data via model_dump()
-            part_data = part.model_dump() if hasattr(part, 'model_dump') else part
-            
-            # Check if it's a text part and extract the text
-            if isinstance(part_data, dict):
-                kind = part_data.get('kind', '')
-                if kind == 'text' and 'text' in part_data:
-                    text_parts.append(part_data['text'])
-                    logger.debug(f"Extracted text: '{part_data['text'][:100]}'")
-            elif hasattr(part, 'text') and part.text:
-                text_parts.append(part.text)
+            # Read attributes directly rather than dumping the whole Pydantic model
+            root = getattr(part, "root", part)
+            if getattr(root, "kind", None) == "text":
+                text = getattr(root, "text", None)
+                if text:
+                    text_parts.append(text)
         
         extracted_text = " ".join(text_parts)
         
         if not extracted_text:
-            logger.warning(f"No text extracted from {len(parts)} parts!")
-            logger.warning(f"Parts data: {[p.model_dump() if hasattr(p, 'model_dump') else p for p in parts]}")
-        else:
-            logger.info(f"Extracted message text: '{extracted_text[:100]}...'")
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("No text extracted from %d parts!", len(parts))
+                logger.warning("Parts data: %s", [p.model_dump() if hasattr(p, 'model_dump') else p for p in parts])
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("Extracted message text: '%s...'", extracted_text[:100])
             
         return extracted_text
     
-    async def _get_chat_history(self, context_id: str) -> Optional[List[dict]]:
+    def _extract_batch_items(self, parts: List[Part]) -> Optional[List[Any]]:
+        """Return the 'items' array of a batch_search_flights data part, if any."""
+        for part in parts:
+            root = getattr(part, "root", part)
+            if getattr(root, "kind", None) != "data":
+                continue
+            items = (getattr(root, "data", None) or {}).get("items")
+            if isinstance(items, list):
+                return items
+        return None
+
+    async def _execute_batch(
+        self,
+        task: Task,
+        items: List[Any],
+        event_queue: EventQueue,
+        auth_metadata: dict[str, Any]
+    ) -> None:
+        """Run a batch of independent flight searches and emit one data artifact."""
+        logger.info("Executing batch of %d flight searches for task %s", len(items), task.id)
+
+        # Build one prompt per valid item; invalid items are reported without an LLM call
+        results: List[dict] = []
+        prompts: List[str] = []
+        prompt_indexes: List[int] = []
+        for item in items:
+            if not isinstance(item, dict) or not item.get("origin") or not item.get("destination"):
+                results.append({"success": False, "error": "Each item needs 'origin' and 'destination'"})
+                continue
+            prompt = f"Find flights from {item['origin']} to {item['destination']}"
+            if item.get("budget"):
+                prompt += f" under ${item['budget']}"
+            results.append({
+                "origin": item["origin"],
+                "destination": item["destination"],
+                "budget": item.get("budget"),
+            })
+            prompts.append(prompt)
+            prompt_indexes.append(len(results) - 1)
+
+        responses = await self.langchain_agent.chat_batch(prompts)
+        for index, response in zip(prompt_indexes, responses):
+            results[index]["success"] = response.get("success", False)
+            if response.get("success"):
+                results[index]["message"] = response.get("message")
+            else:
+                results[index]["error"] = response.get("error")
+
+        result_artifact = new_data_artifact(
+            name='batch_flight_search_result',
+            description='Batch flight search results',
+            data={"results": results},
+        )
+        existing_artifact_meta = getattr(result_artifact, "metadata", None) or {}
+        result_artifact.metadata = {**existing_artifact_meta, **auth_metadata}
+        await event_queue.enqueue_event(
+            TaskArtifactUpdateEvent(
+                append=False,
+                context_id=task.context_id,
+                task_id=task.id,
+                last_chunk=True,
+                artifact=result_artifact,
+                metadata=auth_metadata,
+            )
+        )
+        await event_queue.enqueue_event(
+            TaskStatusUpdateEvent(
+                status=TaskStatus(state=TaskState.completed),
+                final=True,
+                context_id=task.context_id,
+                task_id=task.id,
+                metadata=auth_metadata,
+            )
+        )
+
+    async def _get_chat_history(self, context_id: str) -> Optional[List[BaseMessage]]:
         """
         Retrieve chat history for a context.
 
-        Uses in-memory storage to maintain conversation context.
+        Uses the configured history store to maintain conversation context.
         """
-        history = self._chat_histories.get(context_id)
+        history = await self.history_store.get(context_id)
         if history:
-            logger.debug(f"Retrieved {len(history)} messages for context {context_id}")
+            logger.debug("Retrieved %d messages for context %s", len(history), context_id)
         else:
-            logger.debug(f"No history found for context {context_id}")
+            logger.debug("No history found for context %s", context_id)
         return history
 
-    def _store_chat_message(self, context_id: str, role: str, content: str) -> None:
+    async def _store_chat_message(self, context_id: str, role: str, content: str) -> None:
         """
         Store a chat message in the history for a context.
 
+        Only the last CHAT_HISTORY_MAX_TURNS turns are kept verbatim.
+
         Args:
             context_id: The context identifier
             role: 'user' or 'assistant'
             content: The message content
         """
-        if context_id not in self._chat_histories:
-            self._chat_histories[context_id] = []
-
-        self._chat_histories[context_id].append({
-            "role": role,
-            "content": content
-        })
-        logger.debug(f"Stored {role} message for context {context_id}, total messages: {len(self._chat_histories[context_id])}")
+        await self.history_store.append(context_id, role, content)
+        logger.debug("Stored %s message for context %s", role, context_id)
 
 
 # Create A2A components
@@ -491,19 +610,26 @@ def create_a2a_components():
 # Global instances
 _request_handler: Optional[DefaultRequestHandler] = None
 _agent_executor: Optional[FlightSearchAgentExecutor] = None
+_components_lock = threading.Lock()
+
+
+def _ensure_a2a_components() -> None:
+    """Create the global A2A components once, even under concurrent first calls."""
+    global _request_handler, _agent_executor
+    with _components_lock:
+        if _request_handler is None or _agent_executor is None:
+            _request_handler, _agent_executor = create_a2a_components()
 
 
 def get_request_handler() -> DefaultRequestHandler:
     """Get or create the global request handler instance."""
-    global _request_handler, _agent_executor
     if _request_handler is None:
-        _request_handler, _agent_executor = create_a2a_components()
+        _ensure_a2a_components()
     return _request_handler
 
 
 def get_agent_executor_instance() -> FlightSearchAgentExecutor:
     """Get or create the global agent executor instance."""
-    global _request_handler, _agent_executor
     if _agent_executor is None:
-        _request_handler, _agent_executor = create_a2a_components()
+        _ensure_a2a_components()
     return _agent_executor
@@ -1,23 +1,120 @@
 """
 LangChain agent implementation for flight search using AWS Bedrock.
 """
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, Optional, List, Union
 import json
-import boto3
 
-from langchain_aws import ChatBedrock
- 
-from langchain_classic.agents import AgentExecutor, create_tool_calling_agent
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+from cachetools import TTLCache
 from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import BaseMessage
 
-from agent.config import settings
+from agent.config import get_settings
+from agent.history_store import to_langchain_message
 from agent.mcp_tools import MCPClient
 
+# boto3, langchain_aws and langchain_classic are heavy to import, so they are
+# only loaded when the agent is actually built
+if TYPE_CHECKING:
+    from langchain_aws import ChatBedrock
+    from langchain_classic.agents import AgentExecutor
+
 logger = logging.getLogger(__name__)
 
+# Chat history entries: LangChain messages (as returned by the history stores)
+# or plain {"role": ..., "content": ...} dicts
+ChatHistory = List[Union[BaseMessage, Dict[str, str]]]
+
+# Yielded by FlightSearchAgent.chat_stream when the text streamed since the
+# previous reset preceded a tool call and is not part of the answer
+STREAM_RESET = object()
+
+
+def _to_json(data: Any) -> str:
+    """Serialize tool output compactly; every byte is billed as LLM input tokens."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _content_to_text(content: Any) -> str:
+    """
+    Extract the text from LLM message content.
+
+    Bedrock's Converse API returns content as a list of blocks (text, tool_use,
+    ...); only the text blocks are kept.
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+            if isinstance(block, str) or (isinstance(block, dict) and block.get("type", "text") == "text")
+        )
+    return str(content)
+
+_SYSTEM_PROMPT = """You are a helpful flight search assistant. Your job is to help users find flights based on their preferences.
+
+You have access to a flight search tool that can search for flights given:
+- origin: The departure city or airport
+- destination: The arrival city or airport  
+- budget: The maximum price in USD (optional)
+
+When a user asks about flights, extract the origin, destination, and budget (if mentioned) from their query, 
+then use the search_flights tool to find available flights.
+
+Present the results in a clear, user-friendly format. If multiple flights are found, highlight the best options 
+based on price, duration, or other relevant factors.
+
+If the user's request is unclear, ask for clarification before searching."""
+
+# The prompt does not depend on the agent instance, so build it once
+_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", _SYSTEM_PROMPT),
+    MessagesPlaceholder(variable_name="chat_history", optional=True),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad"),
+])
+
+
+@lru_cache(maxsize=1)
+def _get_bedrock_client():
+    """
+    Return the process-wide bedrock-runtime client.
+
+    Sharing one client keeps its connection pool (and TLS sessions) warm across
+    agent instances; the pool is sized for MAX_CONCURRENT_LLM parallel calls.
+    """
+    import boto3
+    from botocore.config import Config
+
+    settings = get_settings()
+    # Export credentials for any boto3 client LangChain creates on its own
+    settings.export_aws_credentials_to_env()
+    session = boto3.Session(
+        aws_access_key_id=settings.aws_access_key_id,
+        aws_secret_access_key=settings.aws_secret_access_key,
+        region_name=settings.aws_region,
+    )
+    return session.client(
+        "bedrock-runtime",
+        config=Config(
+            max_pool_connections=settings.max_concurrent_llm,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
+    )
+
 
 class FlightSearchAgent:
     """
@@ -26,6 +123,7 @@ class FlightSearchAgent:
     
     def __init__(self):
         """Initialize the flight search agent."""
+        settings = get_settings()
         self.mcp_client = MCPClient(
             server_url=settings.mcp_server_url,
             enabled=settings.mcp_enabled
@@ -33,23 +131,41 @@ class FlightSearchAgent:
         self.llm = self._create_llm()
         self.tools = self._create_tools()
         self.agent_executor = self._create_agent()
+        # Responses keyed by (message, chat_history) digest. Entries expire so
+        # answers built on mock data dated from datetime.now() do not go stale;
+        # beyond the size limit the least recently used are evicted. Only
+        # touched from the event loop and never across an await, so no lock
+        self._response_cache: TTLCache = TTLCache(
+            maxsize=max(settings.response_cache_size, 0),
+            ttl=settings.response_cache_ttl_seconds,
+        )
+        # Bounds concurrent Bedrock invocations across chat and chat_batch
+        self._llm_semaphore = asyncio.Semaphore(settings.max_concurrent_llm)
         logger.info("Flight Search Agent initialized successfully")
     
-    def _create_llm(self) -> ChatBedrock:
+    def _create_llm(self) -> "ChatBedrock":
         """Create and configure AWS Bedrock LLM."""
-        logger.info(f"Initializing AWS Bedrock with model: {settings.bedrock_model_id}")
-        logger.info(f"AWS Region: {settings.aws_region}")
+        from langchain_aws import ChatBedrock
+        
+        settings = get_settings()
+        logger.info("Initializing AWS Bedrock with model: %s", settings.bedrock_model_id)
+        logger.info("AWS Region: %s", settings.aws_region)
         
         # Log credential status (without exposing actual keys)
         if settings.aws_access_key_id:
-            logger.info(f"Using AWS Access Key: {settings.aws_access_key_id[:4]}...{settings.aws_access_key_id[-4:]}")
+            logger.info(
+                "Using AWS Access Key: %s...%s",
+                settings.aws_access_key_id[:4],
+                settings.aws_access_key_id[-4:]
+            )
         else:
             logger.warning("No AWS_ACCESS_KEY_ID found in settings")
         
         try:
             # Create LangChain ChatBedrock with Converse API
-            # Credentials are already set in environment by config.py
+            # Credentials are exported to the environment by _get_bedrock_client
             llm = ChatBedrock(
+                client=_get_bedrock_client(),
                 credentials_profile_name=None,
                 region_name=settings.aws_region,
                 model_id=settings.bedrock_model_id,
@@ -63,10 +179,10 @@ class FlightSearchAgent:
             )
             
             logger.info("AWS Bedrock LLM initialized successfully with Converse API")
-            logger.info(f"Using beta_use_converse_api=True for proper message formatting")
+            logger.info("Using beta_use_converse_api=True for proper message formatting")
             return llm
         except Exception as e:
-            logger.error(f"Failed to initialize AWS Bedrock: {e}")
+            logger.error("Failed to initialize AWS Bedrock: %s", e)
             raise
     
     def _create_tools(self) -> List:
@@ -74,6 +190,9 @@ class FlightSearchAgent:
         
         mcp_client = self.mcp_client
         
+        # When the LLM requests several searches in one turn, AgentExecutor's
+        # async path already runs the tool calls concurrently with
+        # asyncio.gather, so this coroutine must never block the event loop.
         @tool
         async def search_flights(origin: str, destination: str, budget: float = None) -> str:
             """Search for flights based on origin, destination, and budget.
@@ -94,52 +213,29 @@ class FlightSearchAgent:
                     budget=budget
                 )
                 
-                return json.dumps(result, indent=2)
+                return _to_json(result)
                 
             except Exception as e:
-                logger.error(f"Error in flight search tool: {e}")
-                return json.dumps({
+                logger.error("Error in flight search tool: %s", e)
+                return _to_json({
                     "success": False,
                     "error": str(e)
                 })
         
         tools = [search_flights]
         
-        logger.info(f"Created {len(tools)} tools for agent")
+        logger.info("Created %d tools for agent", len(tools))
         return tools
     
-    def _create_agent(self) -> AgentExecutor:
+    def _create_agent(self) -> "AgentExecutor":
         """Create the LangChain agent executor."""
-        
-        # Create prompt template
-        prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                """You are a helpful flight search assistant. Your job is to help users find flights based on their preferences.
-
-You have access to a flight search tool that can search for flights given:
-- origin: The departure city or airport
-- destination: The arrival city or airport  
-- budget: The maximum price in USD (optional)
-
-When a user asks about flights, extract the origin, destination, and budget (if mentioned) from their query, 
-then use the search_flights tool to find available flights.
-
-Present the results in a clear, user-friendly format. If multiple flights are found, highlight the best options 
-based on price, duration, or other relevant factors.
-
-If the user's request is unclear, ask for clarification before searching."""
-            ),
-            MessagesPlaceholder(variable_name="chat_history", optional=True),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
+        from langchain_classic.agents import AgentExecutor, create_tool_calling_agent
         
         # Create agent
         agent = create_tool_calling_agent(
             llm=self.llm,
             tools=self.tools,
-            prompt=prompt
+            prompt=_PROMPT_TEMPLATE
         )
         
         # Create agent executor
@@ -155,10 +251,74 @@ If the user's request is unclear, ask for clarification before searching."""
         logger.info("Agent executor created successfully")
         return agent_executor
     
+    @staticmethod
+    def _response_cache_key(
+        message: str,
+        chat_history: Optional[ChatHistory]
+    ) -> str:
+        """Build the response cache key for a message and its chat history."""
+        history = [
+            (msg.type, msg.content) if isinstance(msg, BaseMessage)
+            else (msg.get("role", "user"), msg.get("content", ""))
+            for msg in chat_history or []
+        ]
+        payload = message.strip() + json.dumps(history)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return an unexpired cached response and mark it as most recently used."""
+        cached = self._response_cache.get(key)
+        return dict(cached) if cached is not None else None
+    
+    def _store_cached_response(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a response, evicting expired and least recently used entries."""
+        if self._response_cache.maxsize <= 0:
+            return
+        self._response_cache[key] = dict(response)
+    
+    async def _bounded_ainvoke(self, message: str, lc_history: List) -> Dict[str, Any]:
+        """Invoke the agent executor, limited to MAX_CONCURRENT_LLM concurrent calls."""
+        async with self._llm_semaphore:
+            return await self.agent_executor.ainvoke({
+                "input": message,
+                "chat_history": lc_history
+            })
+    
+    @staticmethod
+    def _to_lc_history(chat_history: Optional[ChatHistory]) -> List[BaseMessage]:
+        """Convert chat history to LangChain messages."""
+        # History from the stores is already in LangChain format; only plain
+        # dicts need converting
+        return [
+            msg if isinstance(msg, BaseMessage)
+            else to_langchain_message(msg.get("role", "user"), msg.get("content", ""))
+            for msg in chat_history or []
+        ]
+    
+    def _build_response(self, text: str) -> Dict[str, Any]:
+        """Build the response dictionary for a successful chat."""
+        return {
+            "success": True,
+            "message": text,
+            "agent_type": "langchain",
+            "model": get_settings().bedrock_model_id
+        }
+    
+    async def warmup(self) -> None:
+        """
+        Run one throwaway prompt so Bedrock auth, TLS and the agent graph are warm.
+
+        The response is discarded and never enters the response cache.
+        """
+        try:
+            await self._bounded_ainvoke("ping", [])
+        except Exception as e:
+            logger.warning("Agent warm-up failed: %s", e)
+
     async def chat(
         self,
         message: str,
-        chat_history: Optional[List[Dict[str, str]]] = None
+        chat_history: Optional[ChatHistory] = None
     ) -> Dict[str, Any]:
         """
         Process a chat message from the user.
@@ -171,51 +331,144 @@ If the user's request is unclear, ask for clarification before searching."""
             Dictionary containing the agent's response
         """
         try:
-            logger.info(f"Processing chat message: {message[:100]}...")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Processing chat message: %s...", message[:100])
             
-            # Convert chat history to LangChain message format
-            lc_history = []
-            if chat_history:
-                for msg in chat_history:
-                    role = msg.get("role", "user")
-                    content = msg.get("content", "")
-                    if role == "user":
-                        lc_history.append(HumanMessage(content=content))
-                    elif role == "assistant":
-                        lc_history.append(AIMessage(content=content))
+            # Identical prompts within the same history skip the LLM entirely
+            cache_key = self._response_cache_key(message, chat_history)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.info("Returning cached response")
+                return cached
             
             # Invoke agent
-            result = await self.agent_executor.ainvoke({
-                "input": message,
-                "chat_history": lc_history
-            })
+            result = await self._bounded_ainvoke(message, self._to_lc_history(chat_history))
             
-            response = {
-                "success": True,
-                "message": result.get("output", ""),
-                "agent_type": "langchain",
-                "model": settings.bedrock_model_id
-            }
+            response = self._build_response(_content_to_text(result.get("output", "")))
+            self._store_cached_response(cache_key, response)
             
             logger.info("Chat message processed successfully")
             return response
             
         except Exception as e:
-            logger.error(f"Error processing chat message: {e}", exc_info=True)
+            logger.error("Error processing chat message: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": str(e),
                 "message": "I apologize, but I encountered an error processing your request. Please try again."
             }
+    
+    async def chat_stream(
+        self,
+        message: str,
+        chat_history: Optional[ChatHistory] = None
+    ) -> AsyncIterator[Union[str, object]]:
+        """
+        Process a chat message from the user, yielding response text as it is generated.
+        
+        Tokens are forwarded as soon as the LLM produces them. Whether a step
+        is the answer or a preamble to a tool call is only known when the step
+        ends, so after a tool-calling step STREAM_RESET is yielded: the text
+        received since the previous reset is not part of the answer and should
+        be discarded. The text yielded after the last reset equals the message
+        chat() returns.
+        
+        Args:
+            message: User's message
+            chat_history: Optional list of previous messages
+            
+        Yields:
+            Chunks of the agent's response text, or STREAM_RESET
+            
+        Raises:
+            Exception: Any error raised by the LLM or tools
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Streaming chat message: %s...", message[:100])
+        
+        cache_key = self._response_cache_key(message, chat_history)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            logger.info("Returning cached response")
+            yield cached["message"]
+            return
+        
+        # Text yielded since the last STREAM_RESET
+        current: List[str] = []
+        output: Optional[Dict[str, Any]] = None
+        async with self._llm_semaphore:
+            async for event in self.agent_executor.astream_events(
+                {"input": message, "chat_history": self._to_lc_history(chat_history)},
+                version="v2",
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    text = _content_to_text(event["data"]["chunk"].content)
+                    if text:
+                        current.append(text)
+                        yield text
+                elif kind == "on_chat_model_end":
+                    # Text written before a tool call is the model narrating its plan
+                    if current and getattr(event["data"].get("output"), "tool_calls", None):
+                        current.clear()
+                        yield STREAM_RESET
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    # The root run is the AgentExecutor; its output is what chat() returns
+                    output = event["data"].get("output")
+        
+        streamed_text = "".join(current)
+        response_text = (
+            _content_to_text(output.get("output", "")) if isinstance(output, dict)
+            else streamed_text
+        )
+        if response_text != streamed_text:
+            # e.g. the iteration-limit message, which no LLM step produced
+            if current:
+                yield STREAM_RESET
+            yield response_text
+        
+        self._store_cached_response(cache_key, self._build_response(response_text))
+        logger.info("Chat message streamed successfully")
+    
+    async def chat_batch(
+        self,
+        messages: List[str],
+        chat_histories: Optional[List[Optional[ChatHistory]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several independent chat messages concurrently.
+        
+        Args:
+            messages: User messages to process
+            chat_histories: Optional chat history for each message
+            
+        Returns:
+            List of response dictionaries, in the same order as messages
+        """
+        if chat_histories is None:
+            chat_histories = [None] * len(messages)
+        if len(chat_histories) != len(messages):
+            raise ValueError("chat_histories must have the same length as messages")
+        
+        logger.info("Processing batch of %d chat messages", len(messages))
+        # chat() turns every error into an error response, so a failed message
+        # never aborts the others; only cancellation propagates
+        return list(await asyncio.gather(
+            *(self.chat(m, h) for m, h in zip(messages, chat_histories))
+        ))
 
 
 # Global agent instance
 _agent_instance: Optional[FlightSearchAgent] = None
+_agent_lock = threading.Lock()
 
 
 def get_agent() -> FlightSearchAgent:
     """Get or create the global agent instance."""
     global _agent_instance
     if _agent_instance is None:
-        _agent_instance = FlightSearchAgent()
+        # Double-checked so concurrent first calls build only one agent
+        with _agent_lock:
+            if _agent_instance is None:
+                _agent_instance = FlightSearchAgent()
     return _agent_instance
@@ -2,9 +2,14 @@
 Configuration management for the Flight Search Agent.
 """
 import os
+from functools import cached_property, lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Local development reads .env.local; in production (Heroku) it never exists,
+# so skip the env-file lookup entirely
+_ENV_FILE = ".env.local" if os.path.exists(".env.local") else None
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -24,23 +29,37 @@ class Settings(BaseSettings):
     mcp_server_url: str = "http://localhost:8080"
     mcp_enabled: bool = True
     
+    # Agent Configuration
+    response_cache_size: int = 512  # Max cached LLM responses (0 disables)
+    response_cache_ttl_seconds: int = 300  # Cached responses expire after this
+    chat_history_max_turns: int = 8  # Turns kept verbatim per context
+    max_concurrent_llm: int = 8  # Max concurrent Bedrock invocations
+    warmup_on_start: bool = False  # Send a dummy prompt to Bedrock at startup
+    history_max_contexts: int = 10_000  # Max conversations kept in memory
+    history_ttl_seconds: int = 3600  # Idle conversations expire after this
+    
+    # Chat History Storage ("memory", "redis" or "sqlite")
+    history_backend: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    sqlite_path: str = "chat_history.db"
+    
     # Application Settings
     app_name: str = "Flight Search Agent"
     environment: str = "development"
     
     model_config = SettingsConfigDict(
-        env_file=".env.local",
+        env_file=_ENV_FILE,
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore"
     )
     
-    @property
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production environment."""
         return self.environment.lower() == "production"
     
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development environment."""
         return self.environment.lower() == "development"
@@ -56,8 +75,14 @@ class Settings(BaseSettings):
             os.environ['AWS_DEFAULT_REGION'] = self.aws_region
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the global settings instance.
 
-# Export AWS credentials to environment so boto3 can find them
-settings.export_aws_credentials_to_env()
+    Settings are loaded on first access rather than at import. AWS
+    credentials are only exported to the environment when the Bedrock client
+    is first created (see agent_core), so consumers that only need server
+    settings never touch them.
+    """
+    return Settings()
@@ -0,0 +1,288 @@
+"""
+Chat history storage backends for the Flight Search Agent.
+
+The in-memory store keeps history per process; the Redis and SQLite stores
+persist it so conversations survive restarts and are shared across workers.
+The backend is selected with the HISTORY_BACKEND setting. Every backend
+returns the same shape of history: recent turns verbatim, older turns folded
+into a rolling summary.
+
+Stores return LangChain message objects so the agent can pass history to the
+LLM without converting it on every turn.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Optional, Protocol, Tuple
+
+from cachetools import TTLCache
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from agent.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_MESSAGE_TYPES = {
+    "user": HumanMessage,
+    "assistant": AIMessage,
+    "system": SystemMessage,
+}
+
+
+def to_langchain_message(role: str, content: str) -> BaseMessage:
+    """Convert a stored role/content pair to a LangChain message."""
+    return _MESSAGE_TYPES.get(role, HumanMessage)(content=content)
+
+
+class ChatHistoryStore(Protocol):
+    """Storage for chat messages keyed by A2A context_id."""
+
+    async def get(self, context_id: str) -> Optional[List[BaseMessage]]:
+        """Return the stored messages for a context, oldest first."""
+        ...
+
+    async def append(self, context_id: str, role: str, content: str) -> None:
+        """Append a message to the history of a context."""
+        ...
+
+
+class _ContextHistory:
+    """
+    Bounded chat history for a single context.
+
+    Keeps the last max_turns turns (user + assistant message pairs) verbatim.
+    Evicted turns are condensed into a rolling summary of one line per
+    message, capped at SUMMARY_SNIPPET_CHARS, which keeps the max_turns most
+    recently evicted turns. A prompt therefore carries at most 2 * max_turns
+    turns. Messages are converted to LangChain objects once, when they are
+    appended.
+    """
+
+    SUMMARY_SNIPPET_CHARS = 200
+
+    def __init__(self, max_turns: int):
+        self.messages: deque[BaseMessage] = deque(maxlen=2 * max_turns)
+        # Two summary lines (user, assistant) per evicted turn
+        self.summary: deque[str] = deque(maxlen=2 * max_turns)
+        self._summary_message: Optional[SystemMessage] = None
+
+    def append(self, role: str, content: str) -> None:
+        """Append a message, folding the oldest turn into the summary when full."""
+        if len(self.messages) == self.messages.maxlen:
+            # Evict the oldest message and everything up to the next user message.
+            # Turns are not always pairs (a failed request leaves a user message
+            # without a reply), and the window must start with a user message
+            # because Bedrock rejects conversations that do not
+            self.summary.append(self._summarize(self.messages.popleft()))
+            while self.messages and not isinstance(self.messages[0], HumanMessage):
+                self.summary.append(self._summarize(self.messages.popleft()))
+            self._summary_message = SystemMessage(
+                content="Summary of earlier conversation:\n" + "\n".join(self.summary)
+            )
+        self.messages.append(to_langchain_message(role, content))
+
+    def to_list(self) -> List[BaseMessage]:
+        """Return the history, prefixed by the summary of evicted turns if any."""
+        history = list(self.messages)
+        if self._summary_message is not None:
+            history.insert(0, self._summary_message)
+        return history
+
+    @classmethod
+    def _summarize(cls, message: BaseMessage) -> str:
+        content = message.content
+        if len(content) > cls.SUMMARY_SNIPPET_CHARS:
+            content = content[:cls.SUMMARY_SNIPPET_CHARS] + " [...]"
+        role = "user" if isinstance(message, HumanMessage) else "assistant"
+        return f"{role}: {content}"
+
+
+def _rebuild_history(max_turns: int, messages: Iterable[Tuple[str, str]]) -> List[BaseMessage]:
+    """Fold raw (role, content) pairs, oldest first, into a summarized history."""
+    context_history = _ContextHistory(max_turns)
+    for role, content in messages:
+        context_history.append(role, content)
+    return context_history.to_list()
+
+
+class InMemoryStore:
+    """
+    Per-process chat history store.
+
+    Idle contexts expire after ttl_seconds and the least recently used are
+    evicted beyond max_contexts. TTLCache is not thread-safe, so the lock
+    covers both the cache lookup and the update of the context's history.
+    """
+
+    def __init__(self, max_turns: int, max_contexts: int, ttl_seconds: int):
+        self.max_turns = max_turns
+        self._histories: TTLCache = TTLCache(maxsize=max_contexts, ttl=ttl_seconds)
+        self._lock = threading.RLock()
+
+    async def get(self, context_id: str) -> Optional[List[BaseMessage]]:
+        with self._lock:
+            context_history = self._histories.get(context_id)
+            return context_history.to_list() if context_history else None
+
+    async def append(self, context_id: str, role: str, content: str) -> None:
+        with self._lock:
+            context_history = self._histories.get(context_id)
+            if context_history is None:
+                context_history = _ContextHistory(self.max_turns)
+            # Re-insert on every write to refresh the context's TTL
+            self._histories[context_id] = context_history
+            context_history.append(role, content)
+
+
+class RedisStore:
+    """
+    Redis-backed chat history store.
+
+    Each context is a list at ctx:{context_id} expiring after ttl_seconds of
+    inactivity. It keeps the last 4 * max_turns messages: the verbatim turns
+    plus the turns the rolling summary covers, which is rebuilt on read.
+    """
+
+    def __init__(self, url: str, max_turns: int, ttl_seconds: int):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise ImportError(
+                "HISTORY_BACKEND=redis requires the 'redis' package (pip install redis)"
+            ) from e
+
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self.max_turns = max_turns
+        self.max_messages = 4 * max_turns
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(context_id: str) -> str:
+        return f"ctx:{context_id}"
+
+    async def get(self, context_id: str) -> Optional[List[BaseMessage]]:
+        raw_messages = await self._redis.lrange(self._key(context_id), 0, -1)
+        if not raw_messages:
+            return None
+        return _rebuild_history(
+            self.max_turns,
+            ((m["role"], m["content"]) for m in map(json.loads, raw_messages)),
+        )
+
+    async def append(self, context_id: str, role: str, content: str) -> None:
+        key = self._key(context_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps({"role": role, "content": content}))
+            pipe.ltrim(key, -self.max_messages, -1)
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+
+class SqliteStore:
+    """
+    SQLite-backed chat history store for single-host deployments.
+
+    Like RedisStore it keeps the last 4 * max_turns messages per context and
+    rebuilds the rolling summary on read. Queries run in a worker thread so
+    they never block the event loop.
+    """
+
+    def __init__(self, path: str, max_turns: int, ttl_seconds: int):
+        self.max_turns = max_turns
+        self.max_messages = 4 * max_turns
+        self.ttl_seconds = ttl_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_messages ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " context_id TEXT NOT NULL,"
+                " role TEXT NOT NULL,"
+                " content TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chat_messages_context"
+                " ON chat_messages (context_id, id)"
+            )
+            # Lets the per-write expiry delete be a range scan, not a table scan
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chat_messages_updated_at"
+                " ON chat_messages (updated_at)"
+            )
+
+    def _get_sync(self, context_id: str) -> List[BaseMessage]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM chat_messages"
+                " WHERE context_id = ? AND updated_at >= ?"
+                " ORDER BY id",
+                (context_id, time.time() - self.ttl_seconds),
+            ).fetchall()
+        return _rebuild_history(self.max_turns, rows) if rows else []
+
+    def _append_sync(self, context_id: str, role: str, content: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO chat_messages (context_id, role, content, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (context_id, role, content, now),
+            )
+            # Keep only the most recent messages for this context
+            self._conn.execute(
+                "DELETE FROM chat_messages WHERE context_id = ? AND id NOT IN ("
+                " SELECT id FROM chat_messages WHERE context_id = ?"
+                " ORDER BY id DESC LIMIT ?)",
+                (context_id, context_id, self.max_messages),
+            )
+            # Refresh the context's TTL and drop expired messages
+            self._conn.execute(
+                "UPDATE chat_messages SET updated_at = ? WHERE context_id = ?",
+                (now, context_id),
+            )
+            self._conn.execute(
+                "DELETE FROM chat_messages WHERE updated_at < ?",
+                (now - self.ttl_seconds,),
+            )
+
+    async def get(self, context_id: str) -> Optional[List[BaseMessage]]:
+        return await asyncio.to_thread(self._get_sync, context_id) or None
+
+    async def append(self, context_id: str, role: str, content: str) -> None:
+        await asyncio.to_thread(self._append_sync, context_id, role, content)
+
+
+def create_history_store() -> ChatHistoryStore:
+    """Create the chat history store selected by HISTORY_BACKEND."""
+    settings = get_settings()
+    backend = settings.history_backend.lower()
+    logger.info("Using '%s' chat history backend", backend)
+
+    if backend == "memory":
+        return InMemoryStore(
+            max_turns=settings.chat_history_max_turns,
+            max_contexts=settings.history_max_contexts,
+            ttl_seconds=settings.history_ttl_seconds,
+        )
+    if backend == "redis":
+        return RedisStore(
+            url=settings.redis_url,
+            max_turns=settings.chat_history_max_turns,
+            ttl_seconds=settings.history_ttl_seconds,
+        )
+    if backend == "sqlite":
+        return SqliteStore(
+            path=settings.sqlite_path,
+            max_turns=settings.chat_history_max_turns,
+            ttl_seconds=settings.history_ttl_seconds,
+        )
+    raise ValueError(
+        f"Unknown HISTORY_BACKEND '{settings.history_backend}' "
+        "(expected 'memory', 'redis' or 'sqlite')"
+    )
@@ -3,62 +3,125 @@ Mock MCP (Model Context Protocol) server tools for flight search.
 This module provides mock implementations until the real MCP server is ready.
 """
 import logging
-from typing import Dict, List, Any, Optional
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Sequence
 from datetime import datetime, timedelta
+from itertools import repeat
 import random
 
 logger = logging.getLogger(__name__)
 
 
+def _build_location_index(airports: Mapping[str, Sequence[str]]) -> Dict[str, str]:
+    """Map each uppercased city name or airport code to its airport code."""
+    index = {key.upper(): codes[0] for key, codes in airports.items()}
+    for codes in airports.values():
+        for code in codes:
+            index.setdefault(code.upper(), code)
+    return index
+
+
+# Trie node key marking the end of a complete location name
+_TRIE_END = ""
+
+
+def _build_location_trie(index: Mapping[str, str]) -> Dict[str, Any]:
+    """Build a nested-dict character trie from a normalized location index."""
+    trie: Dict[str, Any] = {}
+    for key, code in index.items():
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[_TRIE_END] = code
+    return trie
+
+
+def _longest_prefix_match(trie: Dict[str, Any], key: str) -> Optional[str]:
+    """
+    Return the airport code of the longest known location that prefixes key.
+    
+    Only matches ending on a word boundary count, so "NEW YORK CITY" resolves
+    to New York but "BOSTONIAN" does not resolve to BOS.
+    """
+    match = None
+    node = trie
+    for i, char in enumerate(key):
+        node = node.get(char)
+        if node is None:
+            break
+        if _TRIE_END in node and (i + 1 == len(key) or not key[i + 1].isalnum()):
+            match = node[_TRIE_END]
+    return match
+
+
 class MockFlightData:
     """Mock flight data generator for testing."""
     
-    AIRLINES = [
+    AIRLINES = (
         "American Airlines", "Delta Airlines", "United Airlines",
         "Southwest Airlines", "JetBlue", "Alaska Airlines",
         "Spirit Airlines", "Frontier Airlines"
-    ]
+    )
+    
+    # Keys of each generated flight, in output order
+    FLIGHT_FIELDS = (
+        "flight_number", "airline", "origin", "destination",
+        "departure_time", "arrival_time", "duration_minutes", "price",
+        "currency", "stops", "cabin_class", "available_seats"
+    )
+    
+    # Flight number prefix for each airline, index-aligned with AIRLINES
+    AIRLINE_PREFIXES = tuple(a[:2].upper() for a in AIRLINES)
+    
+    # Dedicated generator, created once, rather than the module-level random functions
+    _RNG = random.Random()
     
-    AIRPORTS = {
-        "NYC": ["JFK", "LGA", "EWR"],
-        "New York": ["JFK", "LGA", "EWR"],
-        "LON": ["LHR", "LGW", "STN"],
-        "London": ["LHR", "LGW", "STN"],
-        "LAX": ["LAX"],
-        "Los Angeles": ["LAX"],
-        "SFO": ["SFO"],
-        "San Francisco": ["SFO"],
-        "ORD": ["ORD"],
-        "Chicago": ["ORD"],
-        "MIA": ["MIA"],
-        "Miami": ["MIA"],
-        "BOS": ["BOS"],
-        "Boston": ["BOS"],
-        "SEA": ["SEA"],
-        "Seattle": ["SEA"],
-        "ATL": ["ATL"],
-        "Atlanta": ["ATL"],
-        "DFW": ["DFW"],
-        "Dallas": ["DFW"],
+    # Reusable offsets so the generation loop only indexes, never builds timedeltas
+    _HOUR_TD = tuple(timedelta(hours=h) for h in range(24))
+    _MIN_TD = {0: timedelta(), 30: timedelta(minutes=30)}
+    _DAY_TD = tuple(timedelta(days=d) for d in range(64))
+    
+    _AIRPORTS_RAW = {
+        "NYC": ("JFK", "LGA", "EWR"),
+        "New York": ("JFK", "LGA", "EWR"),
+        "LON": ("LHR", "LGW", "STN"),
+        "London": ("LHR", "LGW", "STN"),
+        "LAX": ("LAX",),
+        "Los Angeles": ("LAX",),
+        "SFO": ("SFO",),
+        "San Francisco": ("SFO",),
+        "ORD": ("ORD",),
+        "Chicago": ("ORD",),
+        "MIA": ("MIA",),
+        "Miami": ("MIA",),
+        "BOS": ("BOS",),
+        "Boston": ("BOS",),
+        "SEA": ("SEA",),
+        "Seattle": ("SEA",),
+        "ATL": ("ATL",),
+        "Atlanta": ("ATL",),
+        "DFW": ("DFW",),
+        "Dallas": ("DFW",),
     }
     
+    # Read-only view; the airport table is a constant
+    AIRPORTS = MappingProxyType(_AIRPORTS_RAW)
+    
+    # Uppercased city/code -> airport code, so normalization is one dict lookup
+    _NORMALIZED = _build_location_index(AIRPORTS)
+    
+    # Character trie over the same keys, for longest-prefix matches like "New York City"
+    _TRIE = _build_location_trie(_NORMALIZED)
+    
     @classmethod
     def normalize_location(cls, location: str) -> Optional[str]:
         """Normalize location name to airport code."""
-        location = location.strip().upper()
-        
-        # Direct match
-        if location in cls.AIRPORTS:
-            return cls.AIRPORTS[location][0]
-        
-        # Case-insensitive match
-        for key, codes in cls.AIRPORTS.items():
-            if location.upper() == key.upper():
-                return codes[0]
-            if location in codes:
-                return location
-        
-        return None
+        key = location.strip().upper()
+        code = cls._NORMALIZED.get(key)
+        if code is None:
+            code = _longest_prefix_match(cls._TRIE, key)
+        return code
     
     @classmethod
     def generate_mock_flights(
@@ -73,49 +136,69 @@ class MockFlightData:
         origin_code = cls.normalize_location(origin) or origin[:3].upper()
         dest_code = cls.normalize_location(destination) or destination[:3].upper()
         
-        flights = []
         base_date = datetime.now() + timedelta(days=7)
         
-        for i in range(num_flights):
-            departure = base_date + timedelta(days=i, hours=random.randint(6, 20))
-            duration = timedelta(hours=random.randint(2, 12), minutes=random.choice([0, 30]))
-            arrival = departure + duration
-            
-            # Generate price
-            base_price = random.randint(200, 1500)
-            if budget:
-                # Generate some flights within budget and some outside
-                if i < num_flights // 2:
-                    price = random.randint(int(budget * 0.5), int(budget * 0.95))
-                else:
-                    price = random.randint(int(budget * 0.8), int(budget * 1.3))
-            else:
-                price = base_price
-            
-            flight = {
-                "flight_number": f"{random.choice(cls.AIRLINES)[:2].upper()}{random.randint(100, 999)}",
-                "airline": random.choice(cls.AIRLINES),
-                "origin": origin_code,
-                "destination": dest_code,
-                "departure_time": departure.isoformat(),
-                "arrival_time": arrival.isoformat(),
-                "duration_minutes": int(duration.total_seconds() / 60),
-                "price": price,
-                "currency": "USD",
-                "stops": random.choice([0, 0, 0, 1]),  # 75% direct flights
-                "cabin_class": random.choice(["Economy", "Economy", "Premium Economy", "Business"]),
-                "available_seats": random.randint(5, 50)
-            }
-            flights.append(flight)
+        # Draw every random field for all flights up front, one call per field
+        rng = cls._RNG
+        departure_hours = rng.choices(range(6, 21), k=num_flights)
+        duration_hours = rng.choices(range(2, 13), k=num_flights)
+        duration_minutes = rng.choices((0, 30), k=num_flights)
+        airline_indexes = rng.choices(range(len(cls.AIRLINES)), k=num_flights)
+        flight_numbers = rng.choices(range(100, 1000), k=num_flights)
+        stops = rng.choices((0, 0, 0, 1), k=num_flights)  # 75% direct flights
+        cabin_classes = rng.choices(
+            ("Economy", "Economy", "Premium Economy", "Business"), k=num_flights
+        )
+        available_seats = rng.choices(range(5, 51), k=num_flights)
         
-        # Sort by price
-        flights.sort(key=lambda x: x["price"])
+        # Generate prices
+        if budget:
+            # Generate some flights within budget and some outside
+            within_budget = num_flights // 2
+            prices = rng.choices(
+                range(int(budget * 0.5), int(budget * 0.95) + 1), k=within_budget
+            ) + rng.choices(
+                range(int(budget * 0.8), int(budget * 1.3) + 1), k=num_flights - within_budget
+            )
+        else:
+            prices = rng.choices(range(200, 1501), k=num_flights)
         
-        # Filter by budget if specified
+        # Rank flights by price and, with a budget, cut at the first price over it;
+        # rejected flights never get dates formatted or a dict built
+        order = sorted(range(num_flights), key=prices.__getitem__)
         if budget:
-            flights = [f for f in flights if f["price"] <= budget]
+            del order[bisect_right(order, budget, key=prices.__getitem__):]
+        
+        hour_td = cls._HOUR_TD
+        min_td = cls._MIN_TD
+        day_td = cls._DAY_TD
+        if num_flights > len(day_td):
+            day_td = [timedelta(days=d) for d in range(num_flights)]
         
-        return flights
+        # Build the kept flights column by column, in FLIGHT_FIELDS order
+        departures = [base_date + day_td[i] + hour_td[departure_hours[i]] for i in order]
+        arrivals = [
+            departure + hour_td[duration_hours[i]] + min_td[duration_minutes[i]]
+            for departure, i in zip(departures, order)
+        ]
+        columns = (
+            [f"{cls.AIRLINE_PREFIXES[airline_indexes[i]]}{flight_numbers[i]}" for i in order],
+            [cls.AIRLINES[airline_indexes[i]] for i in order],
+            repeat(origin_code),
+            repeat(dest_code),
+            [departure.isoformat() for departure in departures],
+            [arrival.isoformat() for arrival in arrivals],
+            [duration_hours[i] * 60 + duration_minutes[i] for i in order],
+            [prices[i] for i in order],
+            repeat("USD"),
+            [stops[i] for i in order],
+            [cabin_classes[i] for i in order],
+            [available_seats[i] for i in order],
+        )
+        
+        # Callers expect one dict per flight, so rows are only materialized here
+        fields = cls.FLIGHT_FIELDS
+        return [dict(zip(fields, row)) for row in zip(*columns)]
 
 
 class MCPClient:
@@ -131,7 +214,9 @@ class MCPClient:
         """
         self.server_url = server_url
         self.enabled = enabled
-        logger.info(f"MCP Client initialized (server_url={server_url}, enabled={enabled})")
+        # Constant for the client's lifetime, so resolve it once
+        self._source = "mcp" if enabled else "mock"
+        logger.info("MCP Client initialized (server_url=%s, enabled=%s)", server_url, enabled)
     
     async def search_flights(
         self,
@@ -150,7 +235,7 @@ class MCPClient:
         Returns:
             Dictionary containing flight search results
         """
-        logger.info(f"Searching flights: {origin} -> {destination}, budget={budget}")
+        logger.info("Searching flights: %s -> %s, budget=%s", origin, destination, budget)
         
         # TODO: Replace with actual MCP server call when ready
         # For now, use mock data
@@ -164,13 +249,11 @@ class MCPClient:
             "flights_found": len(flights),
             "flights": flights,
             "timestamp": datetime.now().isoformat(),
-            "source": "mock" if not self.enabled else "mcp"
+            "source": self._source
         }
 
 
-def create_flight_search_tool_description() -> str:
-    """Create the tool description for LangChain."""
-    return """Search for flights based on origin, destination, and budget.
+FLIGHT_SEARCH_TOOL_DESCRIPTION = """Search for flights based on origin, destination, and budget.
 
 Parameters:
 - origin (str): The origin city or airport code (e.g., 'NYC', 'New York', 'JFK')
@@ -184,3 +267,8 @@ Example usage:
 - search_flights(origin="New York", destination="London", budget=500)
 - search_flights(origin="LAX", destination="NYC", budget=300)
 """
+
+
+def create_flight_search_tool_description() -> str:
+    """Create the tool description for LangChain."""
+    return FLIGHT_SEARCH_TOOL_DESCRIPTION
@@ -2,39 +2,53 @@
 """
 Entry point to run the Flight Search Agent with A2A Protocol support.
 """
+import sys
+
 import uvicorn
-from agent.config import settings
+from agent.config import get_settings
+
+BANNER = """\
+{rule}
+Starting Flight Search Agent - A2A Protocol Server (JSON-RPC)
+{rule}
+
+Server: http://{host}:{port}
+AgentCard: http://localhost:{port}/.well-known/agent-card.json
+Docs: http://localhost:{port}/docs
+
+A2A JSON-RPC Endpoint:
+  POST /agent  (All operations)
+
+Available Methods:
+  - "method": "message/send"    (Send message)
+  - "method": "message/stream"  (Stream message)
+  - "method": "tasks/get"       (Get task)
+  - "method": "tasks/cancel"    (Cancel task)
+  - "method": "tasks/list"      (List tasks)
+
+Example Request:
+  POST /agent
+  {{"jsonrpc": "2.0", "id": "1", "method": "message/send", "params": {{...}}}}
+
+{rule}
+
+"""
 
 if __name__ == "__main__":
-    print("=" * 80)
-    print("Starting Flight Search Agent - A2A Protocol Server (JSON-RPC)")
-    print("=" * 80)
-    print()
-    print(f"Server: http://{settings.host}:{settings.port}")
-    print(f"AgentCard: http://localhost:{settings.port}/.well-known/agent-card.json")
-    print(f"Docs: http://localhost:{settings.port}/docs")
-    print()
-    print("A2A JSON-RPC Endpoint:")
-    print(f"  POST /agent  (All operations)")
-    print()
-    print("Available Methods:")
-    print('  - "method": "message/send"    (Send message)')
-    print('  - "method": "message/stream"  (Stream message)')
-    print('  - "method": "tasks/get"       (Get task)')
-    print('  - "method": "tasks/cancel"    (Cancel task)')
-    print('  - "method": "tasks/list"      (List tasks)')
-    print()
-    print("Example Request:")
-    print('  POST /agent')
-    print('  {"jsonrpc": "2.0", "id": "1", "method": "message/send", "params": {...}}')
-    print()
-    print("=" * 80)
-    print()
+    settings = get_settings()
+
+    # Write the banner in one call instead of one print per line
+    sys.stdout.write(BANNER.format(rule="=" * 80, host=settings.host, port=settings.port))
+    sys.stdout.flush()
     
     uvicorn.run(
         "agent.a2a_main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.is_development,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        # C event loop and HTTP parser from uvicorn[standard]; uvloop has no Windows build
+        loop="auto" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        access_log=not settings.is_production
     )
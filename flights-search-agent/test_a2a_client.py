@@ -5,10 +5,30 @@ Test client for the A2A Protocol Flight Search Agent.
 import asyncio
 import httpx
 import json
-from datetime import datetime
+import orjson
+import time
 
 
 BASE_URL = "http://localhost:5000"
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Constant JSON-RPC envelope; each request only fills in id, method and params
+JSONRPC_TEMPLATE = {"jsonrpc": "2.0", "id": None, "method": None, "params": None}
+
+
+def jsonrpc_body(request_id: str, method: str, params: dict) -> bytes:
+    """Serialize a JSON-RPC request from the constant envelope."""
+    return orjson.dumps(JSONRPC_TEMPLATE | {"id": request_id, "method": method, "params": params})
+
+
+async def fetch_agentcard(client: httpx.AsyncClient) -> httpx.Response:
+    """Fetch the AgentCard."""
+    return await client.get(f"{BASE_URL}/.well-known/agent.json")
+
+
+async def send_message(client: httpx.AsyncClient, body: bytes) -> httpx.Response:
+    """Send a serialized JSON-RPC request to the agent endpoint."""
+    return await client.post(f"{BASE_URL}/agent", content=body, headers=JSON_HEADERS)
 
 
 async def test_a2a_protocol():
@@ -19,13 +39,46 @@ async def test_a2a_protocol():
     print("=" * 80)
     print()
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
+    # One pooled client for every request; HTTP/2 is used when the server offers it
+    async with httpx.AsyncClient(
+        timeout=60.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+    ) as client:
+        
+        # Test 1 and Test 2 are independent, so run them concurrently
+        a2a_request = {
+            "message": {
+                "message_id": f"test-{time.monotonic_ns()}",
+                "role": "ROLE_USER",
+                "parts": [
+                    {
+                        "text": "Find me flights from New York to London under $500",
+                        "media_type": "text/plain"
+                    }
+                ]
+            },
+            "configuration": {
+                "blocking": True
+            }
+        }
+        
+        # JSON-RPC request format
+        jsonrpc_request = jsonrpc_body("test-1", "message/send", a2a_request)
+        
+        agentcard_response, send_response = await asyncio.gather(
+            fetch_agentcard(client),
+            send_message(client, jsonrpc_request),
+            return_exceptions=True
+        )
         
         # Test 1: Get AgentCard
         print("Test 1: Get AgentCard")
         print("-" * 80)
         try:
-            response = await client.get(f"{BASE_URL}/.well-known/agent.json")
+            if isinstance(agentcard_response, Exception):
+                raise agentcard_response
+            response = agentcard_response
             if response.status_code == 200:
                 agentcard = response.json()
                 print(f"✅ AgentCard retrieved successfully")
@@ -35,8 +88,8 @@ async def test_a2a_protocol():
                 print(f"   Skills: {len(agentcard.get('skills', []))} skill(s)")
                 
                 if agentcard.get('skills'):
-                    for skill in agentcard['skills']:
-                        print(f"     - {skill['name']}: {skill['description']}")
+                    lines = [f"     - {s['name']}: {s['description']}" for s in agentcard['skills']]
+                    print("\n".join(lines))
                 
                 print(f"   Metadata: {agentcard.get('metadata', {})}")
                 print()
@@ -51,37 +104,12 @@ async def test_a2a_protocol():
         print("Test 2: Send Message (A2A Protocol)")
         print("-" * 80)
         try:
-            a2a_request = {
-                "message": {
-                    "message_id": f"test-{datetime.utcnow().timestamp()}",
-                    "role": "ROLE_USER",
-                    "parts": [
-                        {
-                            "text": "Find me flights from New York to London under $500",
-                            "media_type": "text/plain"
-                        }
-                    ]
-                },
-                "configuration": {
-                    "blocking": True
-                }
-            }
-            
             print(f"Request: {json.dumps(a2a_request, indent=2)}")
             print()
             
-            # JSON-RPC request format
-            jsonrpc_request = {
-                "jsonrpc": "2.0",
-                "id": "test-1",
-                "method": "message/send",
-                "params": a2a_request
-            }
-            
-            response = await client.post(
-                f"{BASE_URL}/agent",
-                json=jsonrpc_request
-            )
+            if isinstance(send_response, Exception):
+                raise send_response
+            response = send_response
             
             if response.status_code == 200:
                 result = response.json()
@@ -110,13 +138,13 @@ async def test_a2a_protocol():
         print("Test 3: Send Message with Context Group (Multi-turn)")
         print("-" * 80)
         try:
-            context_group_id = f"conv-{datetime.utcnow().timestamp()}"
+            context_group_id = f"conv-{time.monotonic_ns()}"
             
             # First message
             print("First message: Find flights from Boston to Seattle")
             a2a_request_1 = {
                 "message": {
-                    "message_id": f"msg-1-{datetime.utcnow().timestamp()}",
+                    "message_id": f"msg-1-{time.monotonic_ns()}",
                     "role": "ROLE_USER",
                     "context_group_id": context_group_id,
                     "parts": [
@@ -133,7 +161,8 @@ async def test_a2a_protocol():
             
             response_1 = await client.post(
                 f"{BASE_URL}/message:send",
-                json=a2a_request_1
+                content=orjson.dumps(a2a_request_1),
+                headers=JSON_HEADERS
             )
             
             if response_1.status_code == 200:
@@ -146,7 +175,7 @@ async def test_a2a_protocol():
                 print("Follow-up message: What about under $400?")
                 a2a_request_2 = {
                     "message": {
-                        "message_id": f"msg-2-{datetime.utcnow().timestamp()}",
+                        "message_id": f"msg-2-{time.monotonic_ns()}",
                         "role": "ROLE_USER",
                         "context_group_id": context_group_id,
                         "parts": [
@@ -163,7 +192,8 @@ async def test_a2a_protocol():
                 
                 response_2 = await client.post(
                     f"{BASE_URL}/message:send",
-                    json=a2a_request_2
+                    content=orjson.dumps(a2a_request_2),
+                    headers=JSON_HEADERS
                 )
                 
                 if response_2.status_code == 200:
@@ -0,0 +1,86 @@
+"""
+Tests for the bounded chat history kept per context.
+
+Run with: python -m unittest discover -s tests
+"""
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from agent.history_store import _ContextHistory
+
+
+def _add_turns(history: _ContextHistory, start: int, stop: int) -> None:
+    for i in range(start, stop):
+        history.append("user", f"q{i}")
+        history.append("assistant", f"a{i}")
+
+
+class ContextHistoryTest(unittest.TestCase):
+
+    def test_no_summary_until_window_is_full(self):
+        history = _ContextHistory(max_turns=2)
+        _add_turns(history, 0, 2)
+
+        messages = history.to_list()
+
+        self.assertEqual([m.content for m in messages], ["q0", "a0", "q1", "a1"])
+        self.assertNotIsInstance(messages[0], SystemMessage)
+
+    def test_evicted_turns_are_folded_into_summary(self):
+        history = _ContextHistory(max_turns=2)
+        _add_turns(history, 0, 3)
+        history.append("user", "q3")
+
+        messages = history.to_list()
+
+        self.assertIsInstance(messages[0], SystemMessage)
+        self.assertEqual(
+            messages[0].content,
+            "Summary of earlier conversation:\nuser: q0\nassistant: a0\nuser: q1\nassistant: a1",
+        )
+        self.assertEqual([m.content for m in messages[1:]], ["q2", "a2", "q3"])
+
+    def test_summary_keeps_max_turns_evicted_turns(self):
+        history = _ContextHistory(max_turns=2)
+        _add_turns(history, 0, 7)
+
+        summary = history.to_list()[0].content
+
+        self.assertNotIn("q2", summary)
+        self.assertIn("user: q3\nassistant: a3\nuser: q4\nassistant: a4", summary)
+
+    def test_window_starts_with_user_after_unanswered_message(self):
+        history = _ContextHistory(max_turns=2)
+        history.append("user", "q0")  # request failed, no assistant reply stored
+        _add_turns(history, 1, 6)
+
+        messages = history.to_list()
+
+        self.assertIsInstance(messages[1], HumanMessage)
+        for message in messages[1:]:
+            self.assertIsInstance(message, (HumanMessage, AIMessage))
+
+    def test_every_eviction_leaves_window_starting_with_user(self):
+        history = _ContextHistory(max_turns=2)
+        history.append("user", "orphan")
+        for i in range(10):
+            history.append("user", f"q{i}")
+            history.append("assistant", f"a{i}")
+            self.assertIsInstance(history.messages[0], HumanMessage)
+
+    def test_long_messages_are_truncated_in_summary(self):
+        history = _ContextHistory(max_turns=1)
+        long_text = "x" * (_ContextHistory.SUMMARY_SNIPPET_CHARS + 50)
+        history.append("user", long_text)
+        history.append("assistant", "a0")
+        history.append("user", "q1")
+
+        summary = history.to_list()[0].content
+
+        self.assertIn("x" * _ContextHistory.SUMMARY_SNIPPET_CHARS + " [...]", summary)
+        self.assertNotIn("x" * (_ContextHistory.SUMMARY_SNIPPET_CHARS + 1), summary)
+
+
+if __name__ == "__main__":
+    unittest.main()